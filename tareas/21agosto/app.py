@@ -3,6 +3,36 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import os
+import sys
+import hashlib
+
+from densidad import calcular_histograma, calcular_bins_2d, proporcion_liked
+from similares import FEATURES, construir_indice, guardar_indice, cargar_indice, canciones_similares
+from ingesta import hash_contenido, leer_csv_compacto
+
+try:
+    # Paquete de despliegue: empaquetar.py copia el modulo junto a la app
+    from cache_compartido import almacen, activar_copy_on_write
+except ImportError:
+    # En el repositorio el modulo vive solo en trabajofinal/comun
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'trabajofinal', 'comun'))
+    from cache_compartido import almacen, activar_copy_on_write
+
+# La app solo filtra los DataFrames compartidos: vistas sin copia entre sesiones
+activar_copy_on_write()
+
+# Numero de filas a partir del cual los graficos se dibujan desde bins precalculados
+UMBRAL_DENSIDAD = 50000
+
+# Directorio donde se persisten los indices de canciones similares
+DIRECTORIO_INDICES = '.indice_similares'
+
+# Segundos antes de recargar data.csv en segundo plano
+TTL_DATOS = 300
+
+# Tamaño (bytes) a partir del cual se muestra una barra de progreso al leer una subida
+UMBRAL_PROGRESO = 20 * 1024 * 1024
 
 # Configuración de la página
 st.set_page_config(
@@ -15,19 +45,62 @@ st.set_page_config(
 st.title("🎵 Dashboard de Análisis de Spotify")
 st.markdown("---")
 
-# Función para cargar datos
-@st.cache_data
-def load_data(file_path='data.csv'):
-    """Carga los datos desde el archivo CSV"""
+# Función para cargar datos subidos
+@st.cache_data(show_spinner=False)
+def load_data(content_hash, _datos):
+    """Carga un CSV subido; el cache se indexa por el hash del contenido.
+
+    Se leen solo las columnas que usa la app, con tipos compactos y por chunks.
+    Los archivos grandes muestran una barra de progreso mientras se leen. La barra
+    se crea y se vacia dentro de la funcion, asi que en un acierto de cache (que
+    repite los elementos creados aqui) no llega a verse.
+    """
+    hueco = None
+    progreso = None
+    if len(_datos) > UMBRAL_PROGRESO:
+        hueco = st.sidebar.empty()
+        progreso = lambda fraccion: hueco.progress(fraccion, text=f"Leyendo archivo... {fraccion:.0%}")
     try:
-        df = pd.read_csv(file_path)
-        return df
-    except FileNotFoundError:
-        st.error(f"No se encontró el archivo {file_path}.")
-        return None
+        return leer_csv_compacto(_datos, progreso=progreso)
     except Exception as e:
         st.error(f"Error al cargar el archivo: {str(e)}")
         return None
+    finally:
+        if hueco is not None:
+            hueco.empty()
+
+def cargar_datos_defecto(file_path='data.csv'):
+    """Carga data.csv junto con la clave del dataset (archivo, mtime, tamaño)"""
+    dataset_key = (file_path, os.path.getmtime(file_path), os.path.getsize(file_path))
+    return pd.read_csv(file_path), dataset_key
+
+# data.csv se comparte entre todas las sesiones (los archivos subidos son por sesion)
+almacen.registrar('data.csv', cargar_datos_defecto, ttl=TTL_DATOS)
+
+@st.cache_data
+def calcular_agregados(_df_filtered, dataset_key, liked_filter, n_bins_hist=20, n_bins_2d=50):
+    """Precalcula histograma de bailabilidad y bins 2D energia/valencia.
+
+    El DataFrame no se hashea (prefijo _): el cache se indexa por dataset y filtro.
+    """
+    hist = calcular_histograma(_df_filtered['danceability'].values, n_bins=n_bins_hist)
+    bins_2d = calcular_bins_2d(_df_filtered['energy'].values, _df_filtered['valence'].values,
+                               _df_filtered['liked'].values, n_bins=n_bins_2d)
+    return hist, bins_2d
+
+@st.cache_resource
+def obtener_indice(_df, dataset_key):
+    """Carga el indice de similitud desde disco o lo construye y lo guarda.
+
+    cache_resource comparte el mismo indice entre reruns y sesiones sin copiarlo.
+    """
+    nombre = hashlib.sha1(repr(dataset_key).encode()).hexdigest()[:16]
+    directorio = os.path.join(DIRECTORIO_INDICES, nombre)
+    if os.path.exists(os.path.join(directorio, 'features.json')):
+        return cargar_indice(directorio)
+    indice = construir_indice(_df)
+    guardar_indice(indice, directorio)
+    return indice
 
 # Sidebar para cargar archivos
 st.sidebar.header("📁 Cargar Datos")
@@ -39,12 +112,23 @@ uploaded_file = st.sidebar.file_uploader(
 
 # Cargar datos
 df = None
+dataset_key = None
 if uploaded_file is not None:
-    df = load_data(uploaded_file)
-    st.sidebar.success("Archivo cargado exitosamente!")
+    datos = uploaded_file.getvalue()
+    dataset_key = hash_contenido(datos)
+    
+    # Solo se lee si no esta ya en cache (con barra de progreso si es grande)
+    df = load_data(dataset_key, datos)
+    if df is not None:
+        st.sidebar.success("Archivo cargado exitosamente!")
 else:
-    # Usar archivo por defecto si existe
-    df = load_data('data.csv')
+    # Usar archivo por defecto si existe (almacen compartido, recarga en segundo plano)
+    try:
+        df, dataset_key = almacen.obtener('data.csv')
+    except FileNotFoundError:
+        st.error("No se encontró el archivo data.csv.")
+    except Exception as e:
+        st.error(f"Error al cargar el archivo: {str(e)}")
     if df is not None:
         st.sidebar.info("Usando archivo data.csv por defecto")
 
@@ -66,6 +150,18 @@ if df is not None:
     else:
         df_filtered = df
     
+    # Modo densidad: graficar desde agregados cuando hay demasiadas filas
+    umbral_densidad = st.sidebar.number_input(
+        "Filas para modo densidad:",
+        min_value=0,
+        value=UMBRAL_DENSIDAD,
+        step=10000,
+        help="A partir de este numero de canciones los graficos se dibujan desde bins precalculados"
+    )
+    modo_densidad = len(df_filtered) > umbral_densidad
+    if modo_densidad:
+        st.sidebar.info("Modo densidad activado")
+    
     # KPIs principales
     st.header("📈 Métricas Principales")
     
@@ -120,7 +216,12 @@ if df is not None:
         with col3:
             st.subheader("Distribución de Bailabilidad")
             fig3, ax3 = plt.subplots(figsize=(8, 6))
-            ax3.hist(df_filtered['danceability'], bins=20, color='skyblue', alpha=0.7, edgecolor='black')
+            if modo_densidad:
+                (conteos, bordes), _ = calcular_agregados(df_filtered, dataset_key, liked_filter)
+                ax3.bar(bordes[:-1], conteos, width=np.diff(bordes), align='edge',
+                        color='skyblue', alpha=0.7, edgecolor='black')
+            else:
+                ax3.hist(df_filtered['danceability'], bins=20, color='skyblue', alpha=0.7, edgecolor='black')
             ax3.set_xlabel('Bailabilidad')
             ax3.set_ylabel('Frecuencia')
             ax3.set_title('Distribución de Bailabilidad')
@@ -130,12 +231,20 @@ if df is not None:
         with col4:
             st.subheader("Energía vs Valencia")
             fig4, ax4 = plt.subplots(figsize=(8, 6))
-            scatter = ax4.scatter(df_filtered['energy'], df_filtered['valence'], 
-                                c=df_filtered['liked'], cmap='RdYlGn', alpha=0.6)
+            if modo_densidad:
+                _, bins_2d = calcular_agregados(df_filtered, dataset_key, liked_filter)
+                # Color = proporcion de canciones que gustan en cada bin
+                mesh = ax4.pcolormesh(bins_2d['bordes_x'], bins_2d['bordes_y'],
+                                      np.ma.masked_invalid(proporcion_liked(bins_2d)),
+                                      cmap='RdYlGn', vmin=0, vmax=1)
+                plt.colorbar(mesh, ax=ax4, label='Proporción que me gusta')
+            else:
+                scatter = ax4.scatter(df_filtered['energy'], df_filtered['valence'], 
+                                    c=df_filtered['liked'], cmap='RdYlGn', alpha=0.6)
+                plt.colorbar(scatter, ax=ax4, label='Me gusta (0=No, 1=Sí)')
             ax4.set_xlabel('Energía')
             ax4.set_ylabel('Valencia')
             ax4.set_title('Relación entre Energía y Valencia')
-            plt.colorbar(scatter, ax=ax4, label='Me gusta (0=No, 1=Sí)')
             st.pyplot(fig4)
         
         # Mapa de correlación
@@ -159,6 +268,34 @@ if df is not None:
         st.subheader("Estadísticas Descriptivas")
         st.dataframe(df_filtered[numeric_cols].describe())
         
+        # Canciones similares (sobre toda la biblioteca, sin filtros)
+        st.markdown("---")
+        st.header("🔎 Canciones Similares")
+        consultas_texto = st.text_input(
+            "Fila(s) de la canción a consultar (separadas por coma):",
+            value="0",
+            help="Posición de la canción en el archivo. Varias filas se consultan en un solo lote."
+        )
+        k_vecinos = st.slider("Número de canciones similares:", min_value=1, max_value=50, value=5)
+        
+        try:
+            posiciones = [int(v) for v in consultas_texto.split(',') if v.strip() != '']
+        except ValueError:
+            posiciones = []
+            st.warning("Introduce números de fila separados por coma.")
+        posiciones = [p for p in posiciones if 0 <= p < len(df)]
+        
+        if posiciones:
+            indice = obtener_indice(df, dataset_key)
+            vecinos, distancias = canciones_similares(indice, posiciones, k=k_vecinos)
+            resultados = []
+            for consulta, filas, dist in zip(posiciones, vecinos, distancias):
+                similares_df = df.iloc[filas][FEATURES + ['liked']].copy()
+                similares_df.insert(0, 'distancia', dist)
+                similares_df.insert(0, 'consulta', consulta)
+                resultados.append(similares_df)
+            st.dataframe(pd.concat(resultados))
+        
     else:
         st.warning("No hay datos para mostrar con los filtros seleccionados.")
 
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Rango de las caracteristicas normalizadas de Spotify (energy, valence, danceability, ...)
+RANGO_NORMALIZADO = (0.0, 1.0)
+
+
+def _indices_bin(valores, n_bins, rango):
+    """Indice de bin de cada valor (los valores fuera de rango se recortan al borde)"""
+    minimo, maximo = rango
+    ancho = (maximo - minimo) / n_bins
+    indices = np.floor((np.asarray(valores, dtype=np.float64) - minimo) / ancho)
+    return np.clip(indices, 0, n_bins - 1).astype(np.int64)
+
+
+def calcular_histograma(valores, n_bins=20, rango=None):
+    """Conteos de un histograma 1D con binning vectorizado.
+
+    Devuelve (conteos, bordes), igual que np.histogram.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    if rango is None:
+        rango = (valores.min(), valores.max()) if len(valores) > 0 else RANGO_NORMALIZADO
+    if rango[0] == rango[1]:
+        rango = (rango[0] - 0.5, rango[1] + 0.5)
+
+    indices = _indices_bin(valores, n_bins, rango)
+    conteos = np.bincount(indices, minlength=n_bins)
+    bordes = np.linspace(rango[0], rango[1], n_bins + 1)
+    return conteos, bordes
+
+
+def calcular_bins_2d(x, y, liked, n_bins=50, rango_x=RANGO_NORMALIZADO, rango_y=RANGO_NORMALIZADO):
+    """Conteos 2D por bin separados en canciones que gustan y que no gustan.
+
+    Devuelve un diccionario con las matrices 'liked' y 'no_liked' (n_bins x n_bins,
+    indexadas [bin_y, bin_x]) y los bordes de cada eje.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    liked = np.asarray(liked)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y, liked = x[validos], y[validos], liked[validos]
+
+    # Un unico indice plano por punto y un bincount por clase
+    plano = _indices_bin(y, n_bins, rango_y) * n_bins + _indices_bin(x, n_bins, rango_x)
+    es_liked = liked == 1
+    conteos_liked = np.bincount(plano[es_liked], minlength=n_bins * n_bins)
+    conteos_no = np.bincount(plano[~es_liked], minlength=n_bins * n_bins)
+
+    return {
+        'liked': conteos_liked.reshape(n_bins, n_bins),
+        'no_liked': conteos_no.reshape(n_bins, n_bins),
+        'bordes_x': np.linspace(rango_x[0], rango_x[1], n_bins + 1),
+        'bordes_y': np.linspace(rango_y[0], rango_y[1], n_bins + 1),
+    }
+
+
+def proporcion_liked(bins_2d):
+    """Proporcion de canciones que gustan por bin (NaN en bins vacios)"""
+    total = bins_2d['liked'] + bins_2d['no_liked']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, bins_2d['liked'] / total, np.nan)
@@ -0,0 +1,38 @@
+import io
+import hashlib
+import pandas as pd
+
+from similares import FEATURES
+
+# Columnas que usa la app y sus tipos compactos; key, duration_ms y time_signature
+# no se leen
+COLUMNAS = FEATURES + ['mode', 'liked']
+DTYPES = {**{col: 'float32' for col in FEATURES}, 'mode': 'int8', 'liked': 'int8'}
+
+# Filas por chunk al leer archivos grandes
+TAM_CHUNK = 250000
+
+
+def hash_contenido(datos):
+    """Hash del contenido del archivo: la misma subida da la misma clave de cache"""
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def leer_csv_compacto(datos, progreso=None, tam_chunk=TAM_CHUNK):
+    """Lee un CSV de Spotify (bytes) por chunks, solo con las columnas necesarias.
+
+    progreso es una funcion opcional que recibe la fraccion leida (0 a 1).
+    """
+    buffer = io.BytesIO(datos)
+    total = max(len(datos), 1)
+
+    partes = []
+    with pd.read_csv(buffer, usecols=COLUMNAS, dtype=DTYPES, chunksize=tam_chunk) as lector:
+        for chunk in lector:
+            partes.append(chunk)
+            if progreso is not None:
+                progreso(min(buffer.tell() / total, 1.0))
+
+    if not partes:
+        return pd.DataFrame({col: pd.Series(dtype=tipo) for col, tipo in DTYPES.items()})[COLUMNAS]
+    return pd.concat(partes, ignore_index=True)
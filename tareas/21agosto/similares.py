@@ -0,0 +1,106 @@
+import os
+import json
+import numpy as np
+
+# Caracteristicas de audio usadas para medir similitud entre canciones
+FEATURES = ['danceability', 'energy', 'loudness', 'speechiness',
+            'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo']
+
+# Maximo de distancias (consultas x filas) calculadas por bloque, ~64 MB en float32
+MAX_ELEMENTOS_BLOQUE = 2 ** 24
+
+
+def construir_indice(df, features=FEATURES):
+    """Construye el indice de similitud sobre las caracteristicas estandarizadas.
+
+    El indice es un diccionario con la matriz estandarizada (float32), las medias y
+    desviaciones usadas y la norma al cuadrado de cada fila.
+    """
+    matriz = df[features].to_numpy(dtype=np.float64)
+    medias = np.nanmean(matriz, axis=0)
+    desv = np.nanstd(matriz, axis=0)
+    desv[desv == 0] = 1.0
+
+    matriz = np.nan_to_num((matriz - medias) / desv).astype(np.float32)
+    return {
+        'features': list(features),
+        'medias': medias,
+        'desv': desv,
+        'matriz': matriz,
+        'normas': np.einsum('ij,ij->i', matriz, matriz),
+    }
+
+
+def guardar_indice(indice, directorio):
+    """Guarda el indice en disco (.npy por arreglo) para no reconstruirlo"""
+    os.makedirs(directorio, exist_ok=True)
+    for nombre in ['medias', 'desv', 'matriz', 'normas']:
+        np.save(os.path.join(directorio, f'{nombre}.npy'), indice[nombre])
+    with open(os.path.join(directorio, 'features.json'), 'w') as f:
+        json.dump(indice['features'], f)
+
+
+def cargar_indice(directorio):
+    """Carga un indice guardado; la matriz se abre como memmap (sin copiar a memoria)"""
+    with open(os.path.join(directorio, 'features.json')) as f:
+        features = json.load(f)
+    indice = {'features': features}
+    for nombre in ['medias', 'desv', 'normas']:
+        indice[nombre] = np.load(os.path.join(directorio, f'{nombre}.npy'))
+    indice['matriz'] = np.load(os.path.join(directorio, 'matriz.npy'), mmap_mode='r')
+    return indice
+
+
+def estandarizar(indice, valores):
+    """Aplica la misma estandarizacion del indice a nuevas canciones"""
+    valores = np.atleast_2d(np.asarray(valores, dtype=np.float64))
+    return np.nan_to_num((valores - indice['medias']) / indice['desv']).astype(np.float32)
+
+
+def buscar_vecinos(indice, consultas, k=10, excluir=None):
+    """k vecinos mas cercanos (distancia euclidiana) para un lote de consultas.
+
+    consultas son vectores ya estandarizados (n_consultas x n_features). excluir es
+    opcional: para cada consulta, la fila de la biblioteca que no debe devolverse
+    (la propia cancion). Devuelve (posiciones, distancias), ambos n_consultas x k.
+    """
+    consultas = np.atleast_2d(consultas).astype(np.float32)
+    matriz, normas = indice['matriz'], indice['normas']
+    n_consultas, n_filas = len(consultas), len(matriz)
+    k = min(k, n_filas - (1 if excluir is not None else 0))
+
+    tam_bloque = max(1024, MAX_ELEMENTOS_BLOQUE // max(n_consultas, 1))
+    normas_consulta = np.einsum('ij,ij->i', consultas, consultas)
+    mejores_pos = np.empty((n_consultas, 0), dtype=np.int64)
+    mejores_dist = np.empty((n_consultas, 0), dtype=np.float32)
+
+    for inicio in range(0, n_filas, tam_bloque):
+        bloque = np.asarray(matriz[inicio:inicio + tam_bloque])
+        # ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, para todo el bloque a la vez
+        dist = normas_consulta[:, None] + normas[None, inicio:inicio + len(bloque)] - 2 * (consultas @ bloque.T)
+        if excluir is not None:
+            propias = np.asarray(excluir) - inicio
+            filas = np.nonzero((propias >= 0) & (propias < len(bloque)))[0]
+            dist[filas, propias[filas]] = np.inf
+
+        # Top-k del bloque y fusion con el top-k acumulado
+        k_bloque = min(k, len(bloque))
+        parte = np.argpartition(dist, k_bloque - 1, axis=1)[:, :k_bloque]
+        candidatos_pos = np.concatenate([mejores_pos, parte + inicio], axis=1)
+        candidatos_dist = np.concatenate([mejores_dist, np.take_along_axis(dist, parte, axis=1)], axis=1)
+        k_total = min(k, candidatos_dist.shape[1])
+        seleccion = np.argpartition(candidatos_dist, k_total - 1, axis=1)[:, :k_total]
+        mejores_pos = np.take_along_axis(candidatos_pos, seleccion, axis=1)
+        mejores_dist = np.take_along_axis(candidatos_dist, seleccion, axis=1)
+
+    orden = np.argsort(mejores_dist, axis=1)
+    mejores_pos = np.take_along_axis(mejores_pos, orden, axis=1)
+    mejores_dist = np.sqrt(np.maximum(np.take_along_axis(mejores_dist, orden, axis=1), 0))
+    return mejores_pos, mejores_dist
+
+
+def canciones_similares(indice, posiciones, k=10):
+    """Vecinos de canciones que ya estan en la biblioteca (por posicion de fila)"""
+    posiciones = np.atleast_1d(np.asarray(posiciones, dtype=np.int64))
+    consultas = np.asarray(indice['matriz'][posiciones])
+    return buscar_vecinos(indice, consultas, k=k, excluir=posiciones)
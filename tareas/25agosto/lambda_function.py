@@ -3,6 +3,10 @@ import boto3
 import io
 import pandas as pd
 
+# perfiles_parquet.py (tareas/trabajofinal/comun) se incluye en el zip con
+# tareas/trabajofinal/comun/empaquetar.py
+from perfiles_parquet import a_bytes_parquet
+
 s3 = boto3.client("s3")
 
 def lambda_handler(event, context):
@@ -23,14 +27,10 @@ def lambda_handler(event, context):
     averages_df = averages.to_frame().T
     averages_df["source_file"] = "yellow_tripdata_2023-01.parquet"
     
-    output_buffer = io.BytesIO()
-    averages_df.to_parquet(output_buffer, engine="pyarrow", index=False)
-    output_buffer.seek(0)
-    
     s3.put_object(
         Bucket="xideralaws-curso-osvaldo",
         Key="nyc_taxi_2023/processed/averages/yellow_tripdata_2023-01-avg.parquet",
-        Body=output_buffer.getvalue()
+        Body=a_bytes_parquet(averages_df)
     )
     
     return {
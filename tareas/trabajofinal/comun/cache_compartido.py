@@ -0,0 +1,204 @@
+import copy
+import time
+import threading
+import pandas as pd
+
+# Almacen compartido por todas las sesiones de Streamlit de un mismo proceso.
+# A diferencia de @st.cache_data no serializa los DataFrames. Si la app activa
+# copy-on-write de pandas (activar_copy_on_write()), todas las sesiones reciben
+# vistas del mismo objeto sin copiarlo: si una sesion modifica su vista se copia
+# solo lo modificado y el original no cambia. Sin copy-on-write cada sesion recibe
+# una copia completa, para que nunca pueda modificar el valor compartido. Los
+# demas valores mutables (dicts, listas) siempre se copian: suelen ser pequeños.
+#
+# Recarga stale-while-revalidate: cuando una entrada caduca se sigue sirviendo el
+# valor anterior mientras un hilo en segundo plano la recarga. Solo la primera
+# carga de cada entrada (arranque en frio) bloquea a quien la pide.
+
+_PANDAS_3 = int(pd.__version__.split('.')[0]) >= 3
+
+
+def activar_copy_on_write():
+    """Activa copy-on-write de pandas en todo el proceso (opt-in de cada app)"""
+    if not _PANDAS_3:
+        # En pandas 3 copy-on-write ya es el comportamiento por defecto
+        pd.set_option('mode.copy_on_write', True)
+
+
+def copy_on_write_activo():
+    return _PANDAS_3 or pd.get_option('mode.copy_on_write') is True
+
+
+class _Entrada:
+    def __init__(self, cargador, ttl, depende_de):
+        self.cargador = cargador
+        self.ttl = ttl
+        self.depende_de = list(depende_de)
+        self.valor = None
+        self.cargado_en = None
+        # Inicio de la carga que produjo el valor actual (con que datos base se calculo)
+        self.iniciado_en = None
+        self.recargando = False
+        self.lock_carga = threading.Lock()
+
+
+class AlmacenCompartido:
+    """Cache de proceso con recarga en segundo plano y metricas de uso"""
+
+    def __init__(self, intervalo=5.0):
+        self._entradas = {}
+        self._lock = threading.Lock()
+        self._pendientes = set()
+        self._evento = threading.Event()
+        self._intervalo = intervalo
+        self._hilo = None
+        self._metricas = {'aciertos': 0, 'aciertos_caducados': 0, 'fallos': 0,
+                          'recargas': 0, 'errores_recarga': 0,
+                          'tiempo_recarga_total_s': 0.0, 'ultima_recarga_s': None}
+
+    def registrar(self, clave, cargador, ttl=3600, depende_de=(), precargar=True):
+        """Registra una entrada; si ya existe no hace nada (seguro en cada rerun).
+
+        depende_de lista claves base: al recargarse una base, sus derivadas se
+        recalculan en segundo plano. Con precargar la primera carga empieza ya en
+        el hilo de fondo.
+        """
+        with self._lock:
+            if clave in self._entradas:
+                return
+            self._entradas[clave] = _Entrada(cargador, ttl, depende_de)
+            if precargar:
+                self._pendientes.add(clave)
+        self._iniciar_hilo()
+        self._evento.set()
+
+    def obtener(self, clave):
+        """Devuelve el valor de la entrada: una vista sin copia con copy-on-write, si no una copia"""
+        entrada = self._entradas[clave]
+        if entrada.valor is None:
+            # Arranque en frio: una sola carga aunque lleguen varias sesiones a la vez
+            with entrada.lock_carga:
+                if entrada.valor is None:
+                    self._contar('fallos')
+                    # La precarga ya no hace falta: se carga aqui
+                    with self._lock:
+                        self._pendientes.discard(clave)
+                    self._recargar(clave)
+                else:
+                    # La precarga en segundo plano termino mientras se esperaba
+                    self._contar('aciertos')
+            return self._vista(entrada.valor)
+
+        if time.monotonic() - entrada.cargado_en > entrada.ttl:
+            self._contar('aciertos_caducados')
+            self._programar(clave)
+        else:
+            self._contar('aciertos')
+        return self._vista(entrada.valor)
+
+    def invalidar(self, clave):
+        """Fuerza una recarga en segundo plano sin dejar de servir el valor actual"""
+        self._programar(clave)
+
+    def metricas(self):
+        """Tasa de aciertos y tiempos de recarga"""
+        with self._lock:
+            m = dict(self._metricas)
+        consultas = m['aciertos'] + m['aciertos_caducados'] + m['fallos']
+        m['tasa_aciertos'] = (m['aciertos'] + m['aciertos_caducados']) / consultas if consultas else None
+        m['tiempo_recarga_medio_s'] = m['tiempo_recarga_total_s'] / m['recargas'] if m['recargas'] else None
+        return m
+
+    @staticmethod
+    def _vista(valor):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return valor.copy(deep=not copy_on_write_activo())
+        if isinstance(valor, tuple):
+            return tuple(AlmacenCompartido._vista(v) for v in valor)
+        if isinstance(valor, (dict, list, set)):
+            return copy.deepcopy(valor)
+        return valor
+
+    def _contar(self, nombre, cantidad=1):
+        with self._lock:
+            self._metricas[nombre] += cantidad
+
+    def _programar(self, clave):
+        with self._lock:
+            entrada = self._entradas[clave]
+            if entrada.recargando:
+                return
+            entrada.recargando = True
+            self._pendientes.add(clave)
+        self._evento.set()
+
+    def _recargar(self, clave):
+        entrada = self._entradas[clave]
+        inicio = time.monotonic()
+        try:
+            nuevo = entrada.cargador()
+        except Exception as e:
+            self._contar('errores_recarga')
+            print(f"Error recargando '{clave}': {e}")
+            # Se mantiene el valor anterior; se reintenta al caducar de nuevo
+            if entrada.valor is None:
+                raise
+            entrada.cargado_en = time.monotonic()
+            return
+        finally:
+            entrada.recargando = False
+
+        duracion = time.monotonic() - inicio
+        # Sustitucion atomica: las sesiones ven el valor viejo o el nuevo completo
+        entrada.valor = nuevo
+        entrada.cargado_en = time.monotonic()
+        entrada.iniciado_en = inicio
+        with self._lock:
+            self._metricas['recargas'] += 1
+            self._metricas['tiempo_recarga_total_s'] += duracion
+            self._metricas['ultima_recarga_s'] = duracion
+            # Solo las derivadas calculadas antes de este valor; las que aun no se
+            # cargaron lo haran con el valor nuevo
+            derivadas = [c for c, e in self._entradas.items() if clave in e.depende_de
+                         and e.iniciado_en is not None and e.iniciado_en < entrada.cargado_en]
+        for derivada in derivadas:
+            self._programar(derivada)
+
+    def _iniciar_hilo(self):
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._bucle, name='recarga-cache', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            self._evento.wait(timeout=self._intervalo)
+            self._evento.clear()
+
+            # Recarga anticipada: entradas a punto de caducar
+            ahora = time.monotonic()
+            with self._lock:
+                for clave, entrada in self._entradas.items():
+                    if (entrada.cargado_en is not None and not entrada.recargando
+                            and ahora - entrada.cargado_en > 0.9 * entrada.ttl):
+                        entrada.recargando = True
+                        self._pendientes.add(clave)
+                pendientes, self._pendientes = self._pendientes, set()
+                cargados_en = {clave: self._entradas[clave].cargado_en for clave in pendientes}
+
+            for clave in pendientes:
+                entrada = self._entradas[clave]
+                with entrada.lock_carga:
+                    if entrada.cargado_en != cargados_en[clave]:
+                        # Otra carga (arranque en frio en obtener) termino mientras tanto
+                        entrada.recargando = False
+                        continue
+                    try:
+                        self._recargar(clave)
+                    except Exception:
+                        pass
+
+
+# Instancia unica por proceso (los modulos importados sobreviven a los reruns)
+almacen = AlmacenCompartido()
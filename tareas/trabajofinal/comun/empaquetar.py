@@ -0,0 +1,74 @@
+import os
+import shutil
+import zipfile
+
+# Modulos compartidos: viven solo en esta carpeta y se copian en el paquete de
+# cada despliegue que los usa (los zips de las Lambdas y las apps desplegadas por
+# separado no ven el resto del repo).
+
+COMUN = os.path.dirname(os.path.abspath(__file__))
+TAREAS = os.path.abspath(os.path.join(COMUN, '..', '..'))
+
+# Directorio de salida de los zips
+DIST = os.path.abspath(os.path.join(COMUN, '..', 'dist'))
+
+# nombre -> (archivo del handler, modulos compartidos que necesita)
+LAMBDAS = {
+    'lambda_ingesta': (os.path.join(TAREAS, 'trabajofinal', 'dashboard', 'lambda_ingesta.py'),
+                       ['perfiles_parquet.py']),
+    'lambda_taxi': (os.path.join(TAREAS, '25agosto', 'lambda_function.py'),
+                    ['perfiles_parquet.py']),
+}
+
+# nombre -> (carpeta de la app, modulos compartidos que necesita)
+APPS = {
+    'spotify_app': (os.path.join(TAREAS, '21agosto'), ['cache_compartido.py']),
+}
+
+# Archivos de la carpeta de la app que forman parte del despliegue
+EXTENSIONES_APP = ('.py', '.csv', '.txt')
+
+
+def crear_zip_lambda(nombre, destino=DIST):
+    """Crea <destino>/<nombre>.zip con el handler y sus modulos compartidos"""
+    handler, modulos = LAMBDAS[nombre]
+    os.makedirs(destino, exist_ok=True)
+    ruta_zip = os.path.join(destino, f'{nombre}.zip')
+
+    with zipfile.ZipFile(ruta_zip, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.write(handler, os.path.basename(handler))
+        for modulo in modulos:
+            zf.write(os.path.join(COMUN, modulo), modulo)
+    return ruta_zip
+
+
+def crear_app(nombre, destino=DIST):
+    """Copia la app y sus modulos compartidos en <destino>/<nombre>/, lista para desplegar sola"""
+    carpeta, modulos = APPS[nombre]
+    salida = os.path.join(destino, nombre)
+    shutil.rmtree(salida, ignore_errors=True)
+    os.makedirs(salida)
+
+    for archivo in sorted(os.listdir(carpeta)):
+        if archivo.endswith(EXTENSIONES_APP):
+            shutil.copy2(os.path.join(carpeta, archivo), salida)
+    for modulo in modulos:
+        shutil.copy2(os.path.join(COMUN, modulo), salida)
+    return salida
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Empaqueta los despliegues con los modulos compartidos")
+    objetivos = sorted(LAMBDAS) + sorted(APPS)
+    parser.add_argument('objetivos', nargs='*',
+                        help=f"Por defecto, todos: {', '.join(objetivos)}")
+    args = parser.parse_args()
+
+    desconocidos = [o for o in args.objetivos if o not in objetivos]
+    if desconocidos:
+        parser.error(f"objetivos desconocidos: {', '.join(desconocidos)}")
+    for objetivo in args.objetivos or objetivos:
+        creado = crear_zip_lambda(objetivo) if objetivo in LAMBDAS else crear_app(objetivo)
+        print(f"Creado: {creado}")
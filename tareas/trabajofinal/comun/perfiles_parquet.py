@@ -0,0 +1,122 @@
+import io
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Perfiles de escritura Parquet usados por todas las salidas procesadas
+# (lambda_ingesta, lambda del taxi, agregacion_dashboard). Es la unica copia del
+# modulo: las Lambdas lo reciben en su zip con empaquetar.py.
+#   lectura:        zstd, row groups pequeños ordenados por fecha, estadisticas e
+#                   indice de paginas -> lecturas filtradas por fecha muy selectivas
+#   escritura:      snappy, row groups grandes, sin ordenar -> escritura rapida
+#   sin_compresion: como escritura pero sin codec (referencia para el benchmark)
+PERFILES = {
+    'lectura': {
+        'compression': 'zstd',
+        'compression_level': 3,
+        'row_group_size': 64 * 1024,
+        'use_dictionary': True,
+        'write_statistics': True,
+        'write_page_index': True,
+        # Tablas diarias por 'date'; la tabla semanal del dashboard por 'week'
+        'ordenar_por': ['date', 'week'],
+    },
+    'escritura': {
+        'compression': 'snappy',
+        'compression_level': None,
+        'row_group_size': 1024 * 1024,
+        'use_dictionary': True,
+        'write_statistics': True,
+        'write_page_index': False,
+        'ordenar_por': [],
+    },
+    'sin_compresion': {
+        'compression': 'none',
+        'compression_level': None,
+        'row_group_size': 1024 * 1024,
+        'use_dictionary': False,
+        'write_statistics': False,
+        'write_page_index': False,
+        'ordenar_por': [],
+    },
+}
+
+# Perfil por defecto; en Lambda se puede cambiar con la variable de entorno PERFIL_PARQUET
+PERFIL_DEFECTO = os.environ.get('PERFIL_PARQUET', 'lectura')
+
+
+def escribir_parquet(df, destino, perfil=None):
+    """Escribe un DataFrame en Parquet con un perfil (destino: ruta o buffer)"""
+    opciones = dict(PERFILES[perfil or PERFIL_DEFECTO])
+
+    orden = [col for col in opciones.pop('ordenar_por') if col in df.columns]
+    if orden:
+        df = df.sort_values(orden, kind='stable')
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(tabla, destino, **opciones)
+
+
+def a_bytes_parquet(df, perfil=None):
+    """Serializa un DataFrame a bytes Parquet (para s3.put_object)"""
+    buffer = io.BytesIO()
+    escribir_parquet(df, buffer, perfil=perfil)
+    return buffer.getvalue()
+
+
+def benchmark_perfiles(df, columna_filtro='date', fraccion=0.1, repeticiones=3):
+    """Tamaño, tiempo de escritura y tiempo de lectura filtrada por perfil.
+
+    La lectura filtrada pide el ultimo `fraccion` del rango de columna_filtro,
+    como haria el dashboard al mostrar solo las semanas recientes.
+    """
+    valores = df[columna_filtro].sort_values()
+    desde = valores.iloc[int(len(valores) * (1 - fraccion))]
+
+    resultados = []
+    for nombre in PERFILES:
+        tiempos_escritura, tiempos_lectura = [], []
+        for _ in range(repeticiones):
+            buffer = io.BytesIO()
+            inicio = time.perf_counter()
+            escribir_parquet(df, buffer, perfil=nombre)
+            tiempos_escritura.append(time.perf_counter() - inicio)
+
+            buffer.seek(0)
+            inicio = time.perf_counter()
+            leido = pq.read_table(buffer, filters=[(columna_filtro, '>=', desde)])
+            tiempos_lectura.append(time.perf_counter() - inicio)
+
+        resultados.append({
+            'perfil': nombre,
+            'tamano_mb': buffer.getbuffer().nbytes / 1e6,
+            'escritura_s': min(tiempos_escritura),
+            'lectura_filtrada_s': min(tiempos_lectura),
+            'filas_leidas': leido.num_rows,
+        })
+    return pd.DataFrame(resultados)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de perfiles de escritura Parquet")
+    parser.add_argument('csv', nargs='?', default='../russia_losses_equipment.csv')
+    parser.add_argument('--replicas', type=int, default=500,
+                        help="Veces que se replica el dataset para simular un historico grande")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, parse_dates=['date'])
+    if args.replicas > 1:
+        # Copias desplazadas unos minutos: mismo rango de fechas, mas filas por dia
+        copias = []
+        for i in range(args.replicas):
+            copia = df.copy()
+            copia['date'] = copia['date'] + pd.Timedelta(minutes=i)
+            copias.append(copia)
+        df = pd.concat(copias, ignore_index=True)
+
+    print(f"Filas: {len(df):,}")
+    print(benchmark_perfiles(df).to_string(index=False))
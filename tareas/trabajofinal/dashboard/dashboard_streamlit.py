@@ -6,8 +6,18 @@ import plotly.graph_objects as go
 import boto3
 import json
 import io
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data-analysis'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from reduccion_series import figura_lineas
+from cache_compartido import almacen, activar_copy_on_write
+
+# Las sesiones comparten los DataFrames del almacen como vistas sin copia
+activar_copy_on_write()
+
 # Configuración de la página
 st.set_page_config(
     page_title="Pipeline Conflicto Ucrania-Rusia 2022",
@@ -15,27 +25,45 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data
-def load_data_from_s3():
+EQUIPMENT_COLS = ['aircraft', 'helicopter', 'tank', 'APC', 'field_artillery', 'drone']
+
+# Segundos antes de recargar los datos de S3 (la recarga se hace en segundo plano)
+TTL_DATOS = 900
+
+def cargar_datos_s3():
+    """Descarga la tabla semanal y las métricas del pipeline desde S3"""
     s3 = boto3.client('s3')
     bucket_name = 'xideralaws-curso-osvaldo'
 
-    try:
-        # Cargar datos consolidados
-        response = s3.get_object(
-            Bucket=bucket_name,
-            Key='ukraine-war-project/processed-data/weekly_consolidated.parquet'
-        )
-        df_consolidated = pd.read_parquet(io.BytesIO(response['Body'].read()))
+    # Cargar datos consolidados
+    response = s3.get_object(
+        Bucket=bucket_name,
+        Key='ukraine-war-project/processed-data/weekly_consolidated.parquet'
+    )
+    df_consolidated = pd.read_parquet(io.BytesIO(response['Body'].read()))
 
-        # Cargar métricas
-        response = s3.get_object(
-            Bucket=bucket_name,
-            Key='ukraine-war-project/aggregated-data/dashboard_metrics.json'
-        )
-        metrics = json.loads(response['Body'].read().decode('utf-8'))
+    # Cargar métricas
+    response = s3.get_object(
+        Bucket=bucket_name,
+        Key='ukraine-war-project/aggregated-data/dashboard_metrics.json'
+    )
+    metrics = json.loads(response['Body'].read().decode('utf-8'))
+
+    return df_consolidated, metrics
+
+def calcular_totales_equipamiento():
+    """Agregado derivado: total por tipo de equipamiento"""
+    df_consolidated, _ = almacen.obtener('datos_s3')
+    return df_consolidated[EQUIPMENT_COLS].sum()
 
-        return df_consolidated, metrics
+# Registro en el almacen compartido por todas las sesiones (idempotente en cada rerun)
+almacen.registrar('datos_s3', cargar_datos_s3, ttl=TTL_DATOS)
+almacen.registrar('totales_equipamiento', calcular_totales_equipamiento,
+                  ttl=TTL_DATOS, depende_de=['datos_s3'])
+
+def load_data_from_s3():
+    try:
+        return almacen.obtener('datos_s3')
     except Exception as e:
         st.error(f"Error cargando datos: {e}")
         return None, None
@@ -80,18 +108,18 @@ if df_consolidated is not None:
 
     with col1:
         st.subheader("Tendencia Semanal de Personal")
-        fig = px.line(
-            df_consolidated, 
-            x='week', 
+        fig = figura_lineas(
+            df_consolidated,
+            x='week',
             y=['personnel', 'POW'],
-            title="Personal vs Prisioneros por Semana"
+            title="Personal vs Prisioneros por Semana",
+            clave='weekly_consolidated'
         )
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Equipamiento por Tipo")
-        equipment_cols = ['aircraft', 'helicopter', 'tank', 'APC', 'field_artillery', 'drone']
-        equipment_totals = df_consolidated[equipment_cols].sum()
+        equipment_totals = almacen.obtener('totales_equipamiento')
 
         fig = px.bar(
             x=equipment_totals.values,
@@ -122,5 +150,15 @@ if df_consolidated is not None:
         - Dashboard interactivo
         """
     )
+
+    # Métricas del almacen compartido de datos
+    with st.sidebar.expander("Cache de datos"):
+        cache_metrics = almacen.metricas()
+        if cache_metrics['tasa_aciertos'] is not None:
+            st.write(f"Tasa de aciertos: {cache_metrics['tasa_aciertos']:.1%}")
+        if cache_metrics['tiempo_recarga_medio_s'] is not None:
+            st.write(f"Recarga media: {cache_metrics['tiempo_recarga_medio_s']:.2f} s")
+        st.write(f"Recargas: {cache_metrics['recargas']} "
+                 f"(errores: {cache_metrics['errores_recarga']})")
 else:
     st.error("No se pudieron cargar los datos del pipeline")
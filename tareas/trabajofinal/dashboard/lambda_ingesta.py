@@ -5,6 +5,9 @@ import pandas as pd
 import io
 from datetime import datetime
 
+# perfiles_parquet.py (trabajofinal/comun) se incluye en el zip con empaquetar.py
+from perfiles_parquet import a_bytes_parquet
+
 def lambda_handler(event, context):
     s3 = boto3.client('s3')
     bucket_name = 'xideralaws-curso-osvaldo'
@@ -21,14 +24,11 @@ def lambda_handler(event, context):
         df_clean = df.dropna()
         df_clean = df_clean[df_clean.select_dtypes(include='number').ge(0).all(axis=1)]
 
-        # Subir datos limpios
-        buffer = io.BytesIO()
-        df_clean.to_parquet(buffer, engine='pyarrow', index=False)
-
+        # Subir datos limpios (perfil Parquet de salidas procesadas)
         s3.put_object(
             Bucket=bucket_name,
             Key='ukraine-war-project/processed-data/equipment_cleaned.parquet',
-            Body=buffer.getvalue()
+            Body=a_bytes_parquet(df_clean)
         )
 
         return {
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import argparse
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+from cache_columnar import cargar_csv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from perfiles_parquet import escribir_parquet
+
+# Genera las entradas del dashboard de Streamlit a partir de los CSV limpios:
+#   processed-data/weekly_consolidated.parquet  (perdidas por semana)
+#   aggregated-data/dashboard_metrics.json      (metricas principales)
+# Las rutas replican las claves de S3 bajo ukraine-war-project/.
+
+BUCKET = 'xideralaws-curso-osvaldo'
+PREFIJO_S3 = 'ukraine-war-project'
+RUTA_SEMANAL = os.path.join('processed-data', 'weekly_consolidated.parquet')
+RUTA_METRICAS = os.path.join('aggregated-data', 'dashboard_metrics.json')
+
+COLUMNAS_PERSONAL = ['personnel', 'POW']
+
+print("=== AGREGACION PARA DASHBOARD ===")
+
+
+def _nombre_columna(col):
+    """'field artillery' -> 'field_artillery' (nombres que usa el dashboard)"""
+    return col.strip().replace(' ', '_')
+
+
+def unir_por_fecha(df_equipment, df_personnel):
+    """Une equipamiento y personal por fecha con un merge ordenado (sin busquedas por fila)"""
+    equipment = df_equipment.sort_values('date', kind='stable')
+    personnel = df_personnel.sort_values('date', kind='stable')
+
+    equipment_cols = [col for col in equipment.select_dtypes(include=[np.number]).columns
+                      if col not in ['day', 'total_equipment']]
+    personnel_cols = [col for col in COLUMNAS_PERSONAL if col in personnel.columns]
+
+    unido = pd.merge_ordered(equipment[['date'] + equipment_cols],
+                             personnel[['date'] + personnel_cols],
+                             on='date', how='outer')
+    return unido.rename(columns=_nombre_columna)
+
+
+def perdidas_diarias(unido, ultimo_acumulado=None):
+    """Convierte los acumulados diarios en perdidas por dia.
+
+    Se usa el maximo acumulado hasta cada fecha, asi los dias corregidos o las
+    columnas que dejaron de reportarse (rellenas con 0) no generan perdidas
+    negativas. ultimo_acumulado es el estado de una ejecucion anterior.
+    """
+    valores = unido.drop(columns=['date']).fillna(0)
+    previo = pd.Series(ultimo_acumulado or {}, dtype=np.float64).reindex(valores.columns, fill_value=0)
+
+    acumulado = valores.cummax().clip(lower=previo, axis=1)
+    diarias = acumulado.diff()
+    diarias.iloc[0] = acumulado.iloc[0] - previo
+    diarias.insert(0, 'date', unido['date'].values)
+    return diarias, acumulado.iloc[-1]
+
+
+def construir_agregados(unido, semanal_previo=None, metricas_previas=None):
+    """Calcula la tabla semanal y las metricas en una sola pasada sobre las perdidas diarias.
+
+    Con semanal_previo y metricas_previas solo se procesan los dias posteriores a
+    metricas_previas['last_date'] y se actualizan los resultados anteriores.
+    """
+    ultimo_acumulado = None
+    if metricas_previas is not None:
+        unido = unido[unido['date'] > pd.Timestamp(metricas_previas['last_date'])]
+        ultimo_acumulado = metricas_previas['last_cumulative']
+        if unido.empty:
+            print("No hay dias nuevos")
+            return semanal_previo, metricas_previas
+
+    diarias, acumulado = perdidas_diarias(unido, ultimo_acumulado)
+    columnas = [col for col in diarias.columns if col != 'date']
+    equipment_cols = [col for col in columnas if col not in COLUMNAS_PERSONAL]
+
+    # Tabla semanal (semanas de lunes a domingo)
+    week = diarias['date'].dt.to_period('W').dt.start_time.rename('week')
+    semanal = diarias.groupby(week)[columnas].sum()
+    semanal.insert(0, 'days', diarias.groupby(week).size())
+    if semanal_previo is not None:
+        semanal = semanal_previo.set_index('week').add(semanal, fill_value=0)
+    semanal = semanal.round().astype(np.int64).reset_index()
+
+    # Metricas principales
+    dias = len(diarias) + (metricas_previas['days_analyzed'] if metricas_previas else 0)
+    total_personnel = int(acumulado.get('personnel', 0))
+    pico = diarias.loc[diarias['personnel'].idxmax()] if 'personnel' in diarias.columns else None
+    metricas = {
+        'total_personnel_lost': total_personnel,
+        'total_equipment_lost': int(acumulado[equipment_cols].sum()),
+        'avg_daily_personnel': total_personnel / dias if dias > 0 else 0,
+        'peak_day_personnel': int(pico['personnel']) if pico is not None else 0,
+        'peak_day_personnel_date': pico['date'].strftime('%Y-%m-%d') if pico is not None else None,
+        'days_analyzed': dias,
+        'first_date': diarias['date'].min().strftime('%Y-%m-%d'),
+        'last_date': diarias['date'].max().strftime('%Y-%m-%d'),
+        'last_cumulative': {col: float(valor) for col, valor in acumulado.items()},
+        'analysis_date': datetime.now().isoformat(),
+    }
+    if metricas_previas is not None:
+        metricas['first_date'] = metricas_previas['first_date']
+        if metricas_previas['peak_day_personnel'] >= metricas['peak_day_personnel']:
+            metricas['peak_day_personnel'] = metricas_previas['peak_day_personnel']
+            metricas['peak_day_personnel_date'] = metricas_previas['peak_day_personnel_date']
+
+    return semanal, metricas
+
+
+def guardar_agregados(semanal, metricas, subir_s3=False):
+    """Escribe los dos artefactos localmente y, opcionalmente, en S3"""
+    os.makedirs(os.path.dirname(RUTA_SEMANAL), exist_ok=True)
+    os.makedirs(os.path.dirname(RUTA_METRICAS), exist_ok=True)
+    escribir_parquet(semanal, RUTA_SEMANAL)
+    with open(RUTA_METRICAS, 'w') as f:
+        json.dump(metricas, f, indent=2)
+
+    print(f"Guardado: {RUTA_SEMANAL}")
+    print(f"Guardado: {RUTA_METRICAS}")
+
+    if subir_s3:
+        import boto3
+        s3 = boto3.client('s3')
+        for ruta in [RUTA_SEMANAL, RUTA_METRICAS]:
+            clave = f"{PREFIJO_S3}/{ruta.replace(os.sep, '/')}"
+            s3.upload_file(ruta, BUCKET, clave)
+            print(f"Subido: s3://{BUCKET}/{clave}")
+
+
+def main(incremental=False, subir_s3=False):
+    """Genera weekly_consolidated.parquet y dashboard_metrics.json"""
+    try:
+        df_equipment = cargar_csv('equipment_clean.csv')
+        df_personnel = cargar_csv('personnel_clean.csv')
+
+        semanal_previo, metricas_previas = None, None
+        if incremental and os.path.exists(RUTA_SEMANAL) and os.path.exists(RUTA_METRICAS):
+            semanal_previo = pd.read_parquet(RUTA_SEMANAL)
+            with open(RUTA_METRICAS) as f:
+                metricas_previas = json.load(f)
+            print(f"Modo incremental: dias posteriores a {metricas_previas['last_date']}")
+
+        unido = unir_por_fecha(df_equipment, df_personnel)
+        semanal, metricas = construir_agregados(unido, semanal_previo, metricas_previas)
+        guardar_agregados(semanal, metricas, subir_s3=subir_s3)
+
+        print("\nResumen:")
+        print(f"Semanas: {len(semanal)}")
+        print(f"Dias analizados: {metricas['days_analyzed']}")
+        print(f"Total personal perdido: {metricas['total_personnel_lost']:,}")
+        print(f"Total equipamiento perdido: {metricas['total_equipment_lost']:,}")
+
+        print("\n=== AGREGACION COMPLETADA ===")
+
+    except FileNotFoundError:
+        print("Error: No se encuentran los archivos limpios.")
+        print("Ejecuta primero limpieza_datos.py")
+    except Exception as e:
+        print(f"Error generando agregados: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agregados semanales y metricas del dashboard")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Procesa solo los dias nuevos y actualiza los artefactos existentes")
+    parser.add_argument('--s3', action='store_true',
+                        help=f"Sube los artefactos a s3://{BUCKET}/{PREFIJO_S3}/")
+    args = parser.parse_args()
+    main(incremental=args.incremental, subir_s3=args.s3)
@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from cache_columnar import cargar_csv
+
 # Configurar estilo de graficos
 plt.style.use('default')
 sns.set_palette("husl")
@@ -12,9 +14,9 @@ print("Datos de perdidas rusas de equipamiento y personal\n")
 
 # Cargar los datos
 print("1. CARGANDO DATOS...")
-equipment_df = pd.read_csv('russia_losses_equipment.csv')
-corrections_df = pd.read_csv('russia_losses_equipment_correction.csv') 
-personnel_df = pd.read_csv('russia_losses_personnel.csv')
+equipment_df = cargar_csv('russia_losses_equipment.csv')
+corrections_df = cargar_csv('russia_losses_equipment_correction.csv') 
+personnel_df = cargar_csv('russia_losses_personnel.csv')
 
 print(f"- Equipamiento: {equipment_df.shape[0]} filas, {equipment_df.shape[1]} columnas")
 print(f"- Correcciones: {corrections_df.shape[0]} filas, {corrections_df.shape[1]} columnas")
@@ -63,29 +65,24 @@ if 'date' in personnel_df.columns:
     print("- Formato de fechas en personal:", personnel_df['date'].dtype)
 
 # Buscar valores negativos
+# Conteo de negativos de todas las columnas a la vez
+# (para dias anomalos en las perdidas diarias ver deteccion_anomalias.py)
 print("\nValores negativos en equipamiento:")
-for col in numeric_cols_eq:
-    negative_count = (equipment_df[col] < 0).sum()
-    if negative_count > 0:
-        print(f"  {col}: {negative_count} valores negativos")
+negativos_eq = (equipment_df[numeric_cols_eq] < 0).sum()
+for col, negative_count in negativos_eq[negativos_eq > 0].items():
+    print(f"  {col}: {negative_count} valores negativos")
 
 print("\nValores negativos en personal:")
-for col in numeric_cols_pers:
-    negative_count = (personnel_df[col] < 0).sum()
-    if negative_count > 0:
-        print(f"  {col}: {negative_count} valores negativos")
+negativos_pers = (personnel_df[numeric_cols_pers] < 0).sum()
+for col, negative_count in negativos_pers[negativos_pers > 0].items():
+    print(f"  {col}: {negative_count} valores negativos")
 
 # Duplicados
 print(f"\nFilas duplicadas equipamiento: {equipment_df.duplicated().sum()}")
 print(f"Filas duplicadas personal: {personnel_df.duplicated().sum()}")
 
 print("\n5. ANALISIS TEMPORAL")
-# Convertir fechas si es necesario
-if 'date' in equipment_df.columns:
-    equipment_df['date'] = pd.to_datetime(equipment_df['date'])
-if 'date' in personnel_df.columns:
-    personnel_df['date'] = pd.to_datetime(personnel_df['date'])
-
+# Las fechas ya vienen convertidas desde el cache columnar
 # Rangos de fechas
 if 'date' in equipment_df.columns:
     print(f"Periodo equipamiento: {equipment_df['date'].min()} a {equipment_df['date'].max()}")
@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+# Cache columnar (Arrow IPC) de los CSV de entrada. Cada CSV se convierte una sola
+# vez; las siguientes cargas abren el archivo con memory-map, sin volver a parsear
+# el texto ni las fechas, y varios procesos comparten las mismas paginas en memoria.
+
+DIRECTORIO_CACHE = '.cache_columnar'
+
+
+def _hash_archivo(ruta, tam_bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _rutas_cache(ruta_csv):
+    directorio = os.path.join(os.path.dirname(os.path.abspath(ruta_csv)), DIRECTORIO_CACHE)
+    nombre = os.path.splitext(os.path.basename(ruta_csv))[0]
+    return directorio, os.path.join(directorio, f'{nombre}.arrow'), os.path.join(directorio, f'{nombre}.json')
+
+
+def _cache_valido(ruta_csv, ruta_meta, fechas):
+    """Compara mtime/tamaño del CSV con los guardados; si cambio el mtime se verifica el hash"""
+    if not os.path.exists(ruta_meta):
+        return False
+    with open(ruta_meta) as f:
+        meta = json.load(f)
+
+    stat = os.stat(ruta_csv)
+    if meta.get('fechas') != list(fechas) or meta.get('size') != stat.st_size:
+        return False
+    if meta.get('mtime') == stat.st_mtime_ns:
+        return True
+
+    # Mismo tamaño pero otro mtime (copia, checkout...): decidir por contenido
+    if meta.get('sha256') != _hash_archivo(ruta_csv):
+        return False
+    meta['mtime'] = stat.st_mtime_ns
+    with open(ruta_meta, 'w') as f:
+        json.dump(meta, f)
+    return True
+
+
+def _escribir_cache(ruta_csv, directorio, ruta_arrow, ruta_meta, fechas):
+    os.makedirs(directorio, exist_ok=True)
+    stat = os.stat(ruta_csv)
+    df = pd.read_csv(ruta_csv)
+    for col in fechas:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    # Escritura atomica: otros procesos nunca ven un archivo a medio escribir
+    temporal = f'{ruta_arrow}.{os.getpid()}.tmp'
+    with pa.OSFile(temporal, 'wb') as sink:
+        with ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(temporal, ruta_arrow)
+
+    meta = {'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+            'sha256': _hash_archivo(ruta_csv), 'fechas': list(fechas)}
+    temporal = f'{ruta_meta}.{os.getpid()}.tmp'
+    with open(temporal, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporal, ruta_meta)
+
+
+def cargar_csv(ruta_csv, fechas=('date',), copiar=False):
+    """Carga un CSV a traves del cache columnar, con las columnas de fechas ya convertidas.
+
+    Las columnas sin copiar apuntan al archivo mapeado y son de solo lectura:
+    asignar en sitio (df.loc[..., col] = x) lanza "assignment destination is
+    read-only". Reemplazar columnas enteras (df[col] = ...) si funciona. Con
+    copiar=True se devuelve una copia en memoria que se puede modificar.
+
+    Sin pyarrow instalado se usa pd.read_csv + pd.to_datetime directamente.
+    """
+    fechas = tuple(fechas or ())
+    if pa is None:
+        df = pd.read_csv(ruta_csv)
+        for col in fechas:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col])
+        return df
+
+    directorio, ruta_arrow, ruta_meta = _rutas_cache(ruta_csv)
+    if not (os.path.exists(ruta_arrow) and _cache_valido(ruta_csv, ruta_meta, fechas)):
+        _escribir_cache(ruta_csv, directorio, ruta_arrow, ruta_meta, fechas)
+
+    # El mapa no se cierra aqui: los buffers de la tabla apuntan a sus paginas
+    tabla = ipc.open_file(pa.memory_map(ruta_arrow, 'r')).read_all()
+    # split_blocks evita consolidar columnas: las numericas sin nulos no se copian
+    df = tabla.to_pandas(split_blocks=True)
+    return df.copy(deep=True) if copiar else df
@@ -0,0 +1,116 @@
+import os
+import json
+import types
+import hashlib
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Cache de renderizado de figuras: cada PNG se guarda junto con el hash de los
+# datos que lo generaron, del codigo de dibujo, del estilo y el DPI. Si nada
+# cambio, no se vuelve a rasterizar.
+
+MANIFIESTO = '.cache_figuras.json'
+
+# Parametros de estilo que afectan al resultado de las figuras
+PARAMETROS_ESTILO = ['figure.figsize', 'font.size', 'font.family', 'axes.prop_cycle',
+                     'lines.linewidth', 'axes.grid', 'savefig.bbox']
+
+
+def _actualizar_hash(h, valor):
+    if isinstance(valor, pd.DataFrame):
+        h.update(repr((list(valor.columns), list(valor.dtypes))).encode())
+        h.update(pd.util.hash_pandas_object(valor, index=True).values.tobytes())
+    elif isinstance(valor, pd.Series):
+        h.update(repr((valor.name, valor.dtype)).encode())
+        h.update(pd.util.hash_pandas_object(valor, index=True).values.tobytes())
+    elif isinstance(valor, np.ndarray):
+        h.update(repr((valor.dtype, valor.shape)).encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        for clave in sorted(valor):
+            h.update(repr(clave).encode())
+            _actualizar_hash(h, valor[clave])
+    else:
+        h.update(repr(valor).encode())
+
+
+def hash_datos(datos):
+    """Hash del slice de datos de una figura (DataFrames, Series, arrays o escalares)"""
+    h = hashlib.sha256()
+    _actualizar_hash(h, datos)
+    return h.hexdigest()
+
+
+def _actualizar_hash_codigo(h, codigo):
+    h.update(codigo.co_code)
+    h.update(repr(codigo.co_names).encode())
+    for constante in codigo.co_consts:
+        # Funciones anidadas y comprehensions: su repr incluye la direccion de memoria
+        if isinstance(constante, types.CodeType):
+            _actualizar_hash_codigo(h, constante)
+        else:
+            h.update(repr(constante).encode())
+
+
+def hash_dibujo(dibujar):
+    """Hash del codigo de la funcion de dibujo: al editarla se invalida su figura.
+
+    Solo cubre el cuerpo de dibujar, no el de las funciones a las que llama.
+    """
+    h = hashlib.sha256()
+    _actualizar_hash_codigo(h, dibujar.__code__)
+    return h.hexdigest()
+
+
+def hash_estilo():
+    """Hash de los parametros de matplotlib que cambian el aspecto de las figuras"""
+    estilo = {param: repr(plt.rcParams[param]) for param in PARAMETROS_ESTILO}
+    return hashlib.sha256(json.dumps(estilo, sort_keys=True).encode()).hexdigest()
+
+
+def _leer_manifiesto(directorio):
+    ruta = os.path.join(directorio, MANIFIESTO)
+    if not os.path.exists(ruta):
+        return {}
+    try:
+        with open(ruta) as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def _guardar_manifiesto(directorio, manifiesto):
+    ruta = os.path.join(directorio, MANIFIESTO)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'w') as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def renderizar(archivo, datos, dibujar, dpi=300):
+    """Guarda la figura dibujar(datos) en archivo salvo que ya exista una identica.
+
+    Devuelve True si se rasterizo la figura y False si se reutilizo la existente.
+    """
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    clave = {'datos': hash_datos(datos), 'estilo': hash_estilo(), 'dpi': dpi,
+             'dibujo': hash_dibujo(dibujar)}
+
+    manifiesto = _leer_manifiesto(directorio)
+    nombre = os.path.basename(archivo)
+    if manifiesto.get(nombre) == clave and os.path.exists(archivo):
+        print(f"Sin cambios: {archivo}")
+        return False
+
+    fig = dibujar(datos)
+    fig.savefig(archivo, dpi=dpi, bbox_inches='tight')
+    print(f"Guardado: {archivo}")
+    plt.show()
+    plt.close(fig)
+
+    # Releer por si otra figura se guardo mientras tanto
+    manifiesto = _leer_manifiesto(directorio)
+    manifiesto[nombre] = clave
+    _guardar_manifiesto(directorio, manifiesto)
+    return True
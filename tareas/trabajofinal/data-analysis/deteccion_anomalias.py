@@ -0,0 +1,152 @@
+import argparse
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cache_columnar import cargar_csv
+
+# Deteccion de dias sospechosos antes de aplicar correcciones: mediana movil y
+# z-score robusto (MAD) sobre las perdidas diarias de todas las columnas a la vez.
+
+# Columnas del archivo de correcciones, usadas si no se puede leer su cabecera
+COLUMNAS_CORRECCION = ['date', 'day', 'aircraft', 'helicopter', 'tank', 'APC', 'field artillery',
+                       'MRL', 'drone', 'naval ship', 'submarines', 'anti-aircraft warfare',
+                       'special equipment', 'vehicles and fuel tanks', 'cruise missiles', 'personnel']
+
+# Constante para que el MAD sea comparable a una desviacion estandar (normal)
+ESCALA_MAD = 0.6745
+
+# Memoria maxima (bytes) de las copias temporales por bloque en la mediana movil
+MEMORIA_BLOQUE = 256 * 1024 * 1024
+
+print("=== DETECCION DE ANOMALIAS ===")
+
+
+def deltas_diarios(df_equipment, df_personnel):
+    """Une ambos datasets por fecha y calcula la perdida diaria de cada columna acumulada.
+
+    Devuelve (fechas, columnas, deltas) con deltas como matriz n_dias x n_columnas.
+    Los huecos se rellenan con el ultimo acumulado conocido (delta 0).
+    """
+    equipment = df_equipment.sort_values('date', kind='stable')
+    personnel = df_personnel.sort_values('date', kind='stable')
+
+    equipment_cols = [col for col in equipment.select_dtypes(include=[np.number]).columns
+                      if col not in ['day', 'total_equipment']]
+    personnel_cols = [col for col in personnel.select_dtypes(include=[np.number]).columns
+                      if col not in ['day'] and col not in equipment_cols]
+
+    unido = pd.merge_ordered(equipment[['date', 'day'] + equipment_cols],
+                             personnel[['date'] + personnel_cols],
+                             on='date', how='outer')
+    columnas = equipment_cols + personnel_cols
+
+    acumulados = unido[columnas].ffill().to_numpy(dtype=np.float64)
+    deltas = np.diff(acumulados, axis=0, prepend=acumulados[:1])
+    return unido[['date', 'day']].reset_index(drop=True), columnas, np.nan_to_num(deltas)
+
+
+def mediana_y_mad_movil(deltas, ventana=15, memoria_bloque=MEMORIA_BLOQUE):
+    """Mediana movil centrada y MAD de cada columna en una sola pasada vectorizada.
+
+    La ventana deslizante es una vista (sin copiar) sobre la matriz completa; se
+    recorre por bloques de filas para acotar la memoria con millones de filas.
+    Cada bloque materializa a lo sumo dos copias de filas x columnas x ventana, y
+    el numero de filas se elige para que juntas no pasen de memoria_bloque bytes.
+    """
+    # Ventana impar: la mediana es el elemento central (np.partition, mas rapido que np.median)
+    mitad = ventana // 2
+    ventana = 2 * mitad + 1
+    relleno = np.pad(deltas, ((mitad, mitad), (0, 0)), mode='edge')
+    ventanas = sliding_window_view(relleno, ventana, axis=0)
+
+    n_columnas = max(deltas.shape[1], 1)
+    filas_bloque = max(memoria_bloque // (2 * n_columnas * ventana * 8), 1)
+
+    mediana = np.empty_like(deltas)
+    mad = np.empty_like(deltas)
+    for inicio in range(0, len(deltas), filas_bloque):
+        bloque = ventanas[inicio:inicio + filas_bloque]
+        # copy(): la vista [..., mitad] mantendria viva la copia particionada entera
+        med = np.partition(bloque, mitad, axis=-1)[..., mitad].copy()
+        mediana[inicio:inicio + filas_bloque] = med
+        desviaciones = bloque - med[..., None]
+        np.abs(desviaciones, out=desviaciones)
+        mad[inicio:inicio + filas_bloque] = np.partition(desviaciones, mitad, axis=-1)[..., mitad]
+        del desviaciones
+    return mediana, mad
+
+
+def detectar_anomalias(df_equipment, df_personnel, ventana=15, umbral=6.0, mad_minimo=1.0):
+    """Calcula z-scores robustos y marca dias anomalos.
+
+    Un valor es sospechoso si su z-score supera el umbral o si la perdida diaria es
+    negativa (el acumulado bajo). mad_minimo evita z infinitos en columnas casi
+    constantes (por ejemplo submarinos, con perdidas 0 casi todos los dias).
+    Devuelve (fechas, columnas, deltas, mediana, zscores, sospechosos).
+    """
+    fechas, columnas, deltas = deltas_diarios(df_equipment, df_personnel)
+    mediana, mad = mediana_y_mad_movil(deltas, ventana=ventana)
+
+    zscores = ESCALA_MAD * (deltas - mediana) / np.maximum(mad, mad_minimo)
+    sospechosos = (np.abs(zscores) > umbral) | (deltas < 0)
+    return fechas, columnas, deltas, mediana, zscores, sospechosos
+
+
+def correcciones_candidatas(fechas, columnas, deltas, mediana, sospechosos, layout=COLUMNAS_CORRECCION):
+    """Filas candidatas con el formato de russia_losses_equipment_correction.csv.
+
+    Cada valor es el ajuste sugerido para la perdida de ese dia (mediana movil menos
+    el delta observado) en las columnas sospechosas y 0 en el resto.
+    """
+    ajustes = np.where(sospechosos, np.rint(mediana - deltas), 0).astype(np.int64)
+    ajustes = pd.DataFrame(ajustes, columns=columnas)
+
+    columnas_layout = [col for col in layout if col not in ['date', 'day']]
+    ajustes = ajustes.reindex(columns=columnas_layout, fill_value=0)
+    filas = (ajustes != 0).any(axis=1).to_numpy()
+
+    candidatas = pd.concat([fechas[filas].reset_index(drop=True), ajustes[filas].reset_index(drop=True)], axis=1)
+    candidatas['date'] = candidatas['date'].dt.strftime('%Y-%m-%d')
+    candidatas['day'] = candidatas['day'].astype('Int64')
+    return candidatas[layout]
+
+
+def main(ventana=15, umbral=6.0, salida='correcciones_candidatas.csv'):
+    """Detecta dias anomalos en los datos originales y guarda las correcciones candidatas"""
+    try:
+        equipment_df = cargar_csv('russia_losses_equipment.csv')
+        personnel_df = cargar_csv('russia_losses_personnel.csv')
+        try:
+            layout = list(pd.read_csv('russia_losses_equipment_correction.csv', nrows=0).columns)
+        except FileNotFoundError:
+            layout = COLUMNAS_CORRECCION
+
+        fechas, columnas, deltas, mediana, zscores, sospechosos = detectar_anomalias(
+            equipment_df, personnel_df, ventana=ventana, umbral=umbral)
+        candidatas = correcciones_candidatas(fechas, columnas, deltas, mediana, sospechosos, layout)
+        candidatas.to_csv(salida, index=False)
+
+        print(f"Dias analizados: {len(fechas)}, columnas: {len(columnas)}")
+        print("\nValores sospechosos por columna:")
+        conteos = pd.Series(sospechosos.sum(axis=0), index=columnas)
+        for col, n in conteos[conteos > 0].items():
+            print(f"  {col}: {n}")
+        print(f"\nFilas candidatas a correccion: {len(candidatas)}")
+        print(f"Guardado: {salida}")
+
+        print("\n=== DETECCION COMPLETADA ===")
+
+    except FileNotFoundError as e:
+        print(f"Error: No se encuentran los archivos CSV: {e}")
+    except Exception as e:
+        print(f"Error durante la deteccion: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deteccion de dias anomalos (mediana movil + MAD)")
+    parser.add_argument('--ventana', type=int, default=15, help="Dias de la ventana movil (impar)")
+    parser.add_argument('--umbral', type=float, default=6.0, help="Umbral del z-score robusto")
+    parser.add_argument('--salida', default='correcciones_candidatas.csv')
+    args = parser.parse_args()
+    main(ventana=args.ventana, umbral=args.umbral, salida=args.salida)
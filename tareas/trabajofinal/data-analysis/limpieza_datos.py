@@ -1,11 +1,26 @@
+import os
+import glob
+import argparse
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from cache_columnar import cargar_csv
+
+# Entradas por defecto (se aceptan tambien globs o directorios de particiones)
+ENTRADA_EQUIPAMIENTO = 'russia_losses_equipment.csv'
+ENTRADA_PERSONAL = 'russia_losses_personnel.csv'
+ENTRADA_CORRECCIONES = 'russia_losses_equipment_correction.csv'
+
 print("=== LIMPIEZA Y TRANSFORMACION DE DATOS ===")
 
-def limpiar_equipamiento(df):
-    """Limpia y transforma datos de equipamiento"""
+def limpiar_equipamiento(df, numeric_cols=None):
+    """Limpia y transforma datos de equipamiento
+    
+    numeric_cols permite fijar las columnas numericas (al limpiar por particiones,
+    una columna de texto vacia en una particion se leeria como numerica).
+    """
     print("Limpiando datos de equipamiento...")
     
     # Copiar dataframe
@@ -16,7 +31,9 @@ def limpiar_equipamiento(df):
         df_clean['date'] = pd.to_datetime(df_clean['date'])
     
     # Rellenar valores nulos con 0
-    numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+    if numeric_cols is None:
+        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+    numeric_cols = list(numeric_cols)
     df_clean[numeric_cols] = df_clean[numeric_cols].fillna(0)
     
     # Convertir negativos a 0 
@@ -31,7 +48,7 @@ def limpiar_equipamiento(df):
     print(f"Filas antes: {len(df)}, Filas despues: {len(df_clean)}")
     return df_clean
 
-def limpiar_personal(df):
+def limpiar_personal(df, numeric_cols=None):
     """Limpia y transforma datos de personal"""
     print("Limpiando datos de personal...")
     
@@ -42,7 +59,9 @@ def limpiar_personal(df):
         df_clean['date'] = pd.to_datetime(df_clean['date'])
     
     # Rellenar nulos
-    numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+    if numeric_cols is None:
+        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+    numeric_cols = list(numeric_cols)
     df_clean[numeric_cols] = df_clean[numeric_cols].fillna(0)
     
     # Limpiar negativos
@@ -87,46 +106,208 @@ def generar_metricas_agregadas(df_equipment, df_personnel):
     
     metricas = {}
     
+    # Se agrupa por la fecha sin añadir columnas a los DataFrames de entrada
+    # y sumando solo columnas numericas (las fechas y textos no se pueden sumar)
     if 'date' in df_equipment.columns:
         # Métricas por mes
-        df_equipment['month'] = df_equipment['date'].dt.to_period('M')
-        monthly_equipment = df_equipment.groupby('month').sum()
+        month = df_equipment['date'].dt.to_period('M').rename('month')
+        monthly_equipment = df_equipment.groupby(month).sum(numeric_only=True)
         metricas['monthly_equipment'] = monthly_equipment
         
         # Métricas por semana
-        df_equipment['week'] = df_equipment['date'].dt.to_period('W')
-        weekly_equipment = df_equipment.groupby('week').sum()
+        week = df_equipment['date'].dt.to_period('W').rename('week')
+        weekly_equipment = df_equipment.groupby(week).sum(numeric_only=True)
         metricas['weekly_equipment'] = weekly_equipment
     
     if 'date' in df_personnel.columns:
-        df_personnel['month'] = df_personnel['date'].dt.to_period('M')
-        monthly_personnel = df_personnel.groupby('month').sum()
+        month = df_personnel['date'].dt.to_period('M').rename('month')
+        monthly_personnel = df_personnel.groupby(month).sum(numeric_only=True)
         metricas['monthly_personnel'] = monthly_personnel
         
-        df_personnel['week'] = df_personnel['date'].dt.to_period('W')
-        weekly_personnel = df_personnel.groupby('week').sum()
+        week = df_personnel['date'].dt.to_period('W').rename('week')
+        weekly_personnel = df_personnel.groupby(week).sum(numeric_only=True)
         metricas['weekly_personnel'] = weekly_personnel
     
     return metricas
 
-def main():
-    """Función principal de limpieza"""
+def expandir_entradas(patrones):
+    """Lista ordenada de archivos CSV a partir de rutas, globs o directorios"""
+    if isinstance(patrones, str):
+        patrones = [patrones]
+    
+    archivos = []
+    for patron in patrones:
+        if os.path.isdir(patron):
+            archivos.extend(glob.glob(os.path.join(patron, '**', '*.csv'), recursive=True))
+        elif glob.has_magic(patron):
+            archivos.extend(glob.glob(patron, recursive=True))
+        else:
+            archivos.append(patron)
+    
+    if not archivos:
+        raise FileNotFoundError(f"No hay archivos CSV para {patrones}")
+    
+    # Orden determinista, sin duplicados
+    return sorted(set(archivos))
+
+def _inspeccionar_particion(ruta):
+    """Columnas, tipo de cada columna y rango de fechas de una particion"""
+    df = cargar_csv(ruta)
+    tipos = {}
+    for col in df.columns:
+        if df[col].isna().all():
+            tipos[col] = 'vacia'
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            tipos[col] = 'numerica'
+        else:
+            tipos[col] = 'otra'
+    
+    fechas = (df['date'].min(), df['date'].max()) if 'date' in df.columns and len(df) > 0 else None
+    return list(df.columns), tipos, fechas
+
+def _limpiar_particion(ruta, tipo, columnas, numeric_cols, df_corrections):
+    """Limpia una particion con el esquema global (se ejecuta en un proceso del pool)"""
+    df = cargar_csv(ruta).reindex(columns=columnas)
+    
+    # Columnas de texto vacias en esta particion: object, como en el archivo completo
+    for col in columnas:
+        if col not in numeric_cols and col != 'date' and df[col].isna().all():
+            df[col] = df[col].astype(object)
+    
+    if tipo == 'equipamiento':
+        df_clean = limpiar_equipamiento(df, numeric_cols=numeric_cols)
+        if df_corrections is not None and 'date' in df_clean.columns and len(df_clean) > 0:
+            # Solo las correcciones dentro del rango de fechas de la particion
+            desde, hasta = df_clean['date'].min(), df_clean['date'].max()
+            fechas_corr = pd.to_datetime(df_corrections['date'])
+            relevantes = df_corrections[(fechas_corr >= desde) & (fechas_corr <= hasta)].copy()
+            df_clean = aplicar_correcciones(df_clean, relevantes)
+        return df_clean
+    
+    return limpiar_personal(df, numeric_cols=numeric_cols)
+
+def limpiar_particionado(archivos, tipo, df_corrections=None, workers=None):
+    """Limpia varias particiones en paralelo y las une en orden de fecha.
+    
+    El resultado es el mismo que limpiar la concatenacion de todos los archivos
+    (ordenada por fecha): el esquema y las columnas numericas se deciden sobre
+    todas las particiones antes de limpiar.
+    """
+    print(f"Limpiando {len(archivos)} particiones de {tipo}...")
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1. Esquema global (la lectura deja cada particion en el cache columnar)
+        inspecciones = list(pool.map(_inspeccionar_particion, archivos))
+        
+        columnas, tipos = [], {}
+        for cols, tipos_particion, _ in inspecciones:
+            for col in cols:
+                if col not in columnas:
+                    columnas.append(col)
+                if tipos.get(col) != 'otra' and tipos_particion[col] != 'vacia':
+                    tipos[col] = tipos_particion[col]
+                tipos.setdefault(col, 'vacia')
+        # Una columna siempre vacia se lee como float en pandas: cuenta como numerica
+        numeric_cols = [col for col in columnas if col != 'date' and tipos[col] != 'otra']
+        
+        # 2. Limpieza de cada particion
+        futuros = [pool.submit(_limpiar_particion, ruta, tipo, columnas, numeric_cols, df_corrections)
+                   for ruta in archivos]
+        partes = [futuro.result() for futuro in futuros]
+    
+    # 3. Union ordenada por fecha (estable: a igual fecha se respeta el orden de archivos)
+    return ordenar_por_fecha(pd.concat(partes, ignore_index=True))
+
+def ordenar_por_fecha(df):
+    """Orden estable por fecha: la salida no depende de como se particionaron las entradas"""
+    if 'date' in df.columns:
+        df = df.sort_values('date', kind='stable').reset_index(drop=True)
+    return df
+
+def _cargar_entradas(patrones):
+    """Concatena todos los archivos de una entrada (para entradas pequeñas como correcciones)"""
+    archivos = expandir_entradas(patrones)
+    return pd.concat([cargar_csv(ruta) for ruta in archivos], ignore_index=True)
+
+def main_spark(validar=False, equipment=ENTRADA_EQUIPAMIENTO, personnel=ENTRADA_PERSONAL,
+               corrections=ENTRADA_CORRECCIONES):
+    """Limpieza con el backend Spark (local[*]), opcionalmente validada contra pandas"""
+    try:
+        import limpieza_spark
+    except ImportError:
+        print("Error: pyspark no esta instalado (pip install pyspark, con Java 17 o 21)")
+        print("Se omite el backend Spark; usa --backend pandas")
+        return
+    
+    spark = limpieza_spark.crear_sesion()
+    try:
+        # Spark lee directamente todas las particiones de cada entrada
+        equipment_df = limpieza_spark.leer_csv(spark, expandir_entradas(equipment))
+        corrections_df = limpieza_spark.leer_csv(spark, expandir_entradas(corrections))
+        personnel_df = limpieza_spark.leer_csv(spark, expandir_entradas(personnel))
+        
+        equipment_clean = limpieza_spark.limpiar_equipamiento(equipment_df)
+        personnel_clean = limpieza_spark.limpiar_personal(personnel_df)
+        equipment_final = limpieza_spark.aplicar_correcciones(equipment_clean, corrections_df)
+        metricas = limpieza_spark.generar_metricas_agregadas(equipment_final, personnel_clean)
+        
+        # Salida nativa de Spark: un directorio con un CSV por particion
+        equipment_final.write.mode('overwrite').csv('equipment_clean_spark', header=True)
+        personnel_clean.write.mode('overwrite').csv('personnel_clean_spark', header=True)
+        
+        print("\nDatos limpios guardados:")
+        print("- equipment_clean_spark/")
+        print("- personnel_clean_spark/")
+        
+        if validar:
+            equipment_pd = limpiar_equipamiento(_cargar_entradas(equipment))
+            personnel_pd = limpiar_personal(_cargar_entradas(personnel))
+            equipment_pd = aplicar_correcciones(equipment_pd, _cargar_entradas(corrections))
+            metricas_pd = generar_metricas_agregadas(equipment_pd, personnel_pd)
+            
+            if limpieza_spark.validar_contra_pandas(equipment_pd, personnel_pd, metricas_pd,
+                                                    equipment_final, personnel_clean, metricas):
+                print("Backend Spark validado: mismos resultados que pandas")
+            else:
+                print("Backend Spark con diferencias respecto a pandas")
+        
+        print("\n=== LIMPIEZA COMPLETADA ===")
+    finally:
+        spark.stop()
+
+def main(backend='pandas', validar=False, equipment=ENTRADA_EQUIPAMIENTO, personnel=ENTRADA_PERSONAL,
+         corrections=ENTRADA_CORRECCIONES, workers=None):
+    """Función principal de limpieza
+    
+    Cada entrada puede ser un archivo, un glob o un directorio de particiones.
+    """
     print("Iniciando proceso de limpieza...")
     
+    if backend == 'spark':
+        main_spark(validar=validar, equipment=equipment, personnel=personnel, corrections=corrections)
+        return
+    
     try:
         # Cargar datos
-        equipment_df = pd.read_csv('russia_losses_equipment.csv')
-        corrections_df = pd.read_csv('russia_losses_equipment_correction.csv')
-        personnel_df = pd.read_csv('russia_losses_personnel.csv')
+        archivos_equipment = expandir_entradas(equipment)
+        archivos_personnel = expandir_entradas(personnel)
+        corrections_df = _cargar_entradas(corrections)
         
         print(f"Datos cargados exitosamente")
         
-        # Limpiar datos
-        equipment_clean = limpiar_equipamiento(equipment_df)
-        personnel_clean = limpiar_personal(personnel_df)
-        
-        # Aplicar correcciones
-        equipment_final = aplicar_correcciones(equipment_clean, corrections_df)
+        if len(archivos_equipment) == 1 and len(archivos_personnel) == 1:
+            # Un solo archivo por fuente: limpieza directa
+            equipment_clean = limpiar_equipamiento(cargar_csv(archivos_equipment[0]))
+            personnel_clean = limpiar_personal(cargar_csv(archivos_personnel[0]))
+            
+            # Aplicar correcciones (mismo orden de salida que con particiones)
+            equipment_final = ordenar_por_fecha(aplicar_correcciones(equipment_clean, corrections_df))
+            personnel_clean = ordenar_por_fecha(personnel_clean)
+        else:
+            # Particiones: limpieza y correcciones en paralelo, union por fecha
+            equipment_final = limpiar_particionado(archivos_equipment, 'equipamiento',
+                                                   df_corrections=corrections_df, workers=workers)
+            personnel_clean = limpiar_particionado(archivos_personnel, 'personal', workers=workers)
         
         # Generar métricas
         metricas = generar_metricas_agregadas(equipment_final, personnel_clean)
@@ -159,4 +340,19 @@ def main():
         print(f"Error durante la limpieza: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Limpieza de datos de perdidas rusas")
+    parser.add_argument('--backend', choices=['pandas', 'spark'], default='pandas',
+                        help="Motor de procesamiento (spark se ejecuta en local[*])")
+    parser.add_argument('--validar', action='store_true',
+                        help="Con --backend spark, compara el resultado con pandas")
+    parser.add_argument('--equipment', nargs='+', default=[ENTRADA_EQUIPAMIENTO],
+                        help="Archivos, globs o directorios de equipamiento")
+    parser.add_argument('--personnel', nargs='+', default=[ENTRADA_PERSONAL],
+                        help="Archivos, globs o directorios de personal")
+    parser.add_argument('--corrections', nargs='+', default=[ENTRADA_CORRECCIONES],
+                        help="Archivos, globs o directorios de correcciones")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos para limpiar particiones (por defecto, todos los nucleos)")
+    args = parser.parse_args()
+    main(backend=args.backend, validar=args.validar, equipment=args.equipment,
+         personnel=args.personnel, corrections=args.corrections, workers=args.workers)
\ No newline at end of file
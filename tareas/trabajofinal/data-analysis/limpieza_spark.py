@@ -0,0 +1,175 @@
+from functools import reduce
+from operator import add
+
+import pandas as pd
+from pyspark.sql import SparkSession, Window
+from pyspark.sql import functions as F
+from pyspark.sql.types import NumericType, DoubleType
+
+# Backend Spark de limpieza_datos: misma semantica que las funciones pandas
+# (limpiar_equipamiento, limpiar_personal, aplicar_correcciones y
+# generar_metricas_agregadas) pero sobre DataFrames de Spark.
+
+
+def crear_sesion(master='local[*]', app_name='limpieza-ucrania'):
+    """Crea (o reutiliza) la sesion de Spark; por defecto local con todos los nucleos"""
+    return (SparkSession.builder
+            .master(master)
+            .appName(app_name)
+            .config('spark.sql.session.timeZone', 'UTC')
+            .getOrCreate())
+
+
+def leer_csv(spark, ruta):
+    """Lee uno o varios CSV con los mismos tipos que pd.read_csv"""
+    df = spark.read.csv(ruta, header=True, inferSchema=True)
+
+    # Spark infiere como texto las columnas completamente vacias; pandas como float
+    conteos = df.select([F.count(F.col(c)).alias(c) for c in df.columns]).first().asDict()
+    for col, n in conteos.items():
+        if n == 0:
+            df = df.withColumn(col, F.col(col).cast(DoubleType()))
+    return df
+
+
+def _columnas_numericas(df):
+    return [f.name for f in df.schema.fields if isinstance(f.dataType, NumericType)]
+
+
+def _limpiar_numericas(df):
+    """Nulos y negativos a 0 en todas las columnas numericas, en un solo select"""
+    numeric_cols = _columnas_numericas(df)
+    tipos = dict(df.dtypes)
+    return df.select([
+        F.when(F.col(c).isNull() | (F.col(c) < 0), F.lit(0)).otherwise(F.col(c)).cast(tipos[c]).alias(c)
+        if c in numeric_cols else F.col(c)
+        for c in df.columns
+    ])
+
+
+def limpiar_equipamiento(df):
+    """Limpia y transforma datos de equipamiento (Spark)"""
+    print("Limpiando datos de equipamiento (Spark)...")
+
+    # Convertir fecha
+    if 'date' in df.columns:
+        df = df.withColumn('date', F.to_timestamp(F.col('date')))
+
+    df_clean = _limpiar_numericas(df)
+
+    # Crear columna total equipamiento
+    equipment_cols = [col for col in _columnas_numericas(df_clean) if col not in ['day']]
+    if equipment_cols:
+        total = reduce(add, [F.col(c).cast(DoubleType()) for c in equipment_cols])
+        df_clean = df_clean.withColumn('total_equipment', total)
+
+    return df_clean
+
+
+def limpiar_personal(df):
+    """Limpia y transforma datos de personal (Spark)"""
+    print("Limpiando datos de personal (Spark)...")
+
+    if 'date' in df.columns:
+        df = df.withColumn('date', F.to_timestamp(F.col('date')))
+
+    return _limpiar_numericas(df)
+
+
+def aplicar_correcciones(df_equipment, df_corrections):
+    """Aplica correcciones al dataset principal (Spark).
+
+    Igual que la version pandas: para cada fecha corregida se reemplazan los
+    valores no nulos de las columnas comunes; si una fecha aparece varias veces,
+    cada columna toma el ultimo valor no nulo en el orden del archivo.
+    """
+    print("Aplicando correcciones (Spark)...")
+
+    if df_corrections.rdd.isEmpty():
+        print("No hay correcciones que aplicar")
+        return df_equipment
+
+    if 'date' not in df_corrections.columns or 'date' not in df_equipment.columns:
+        return df_equipment
+
+    cols = [c for c in df_corrections.columns if c != 'date' and c in df_equipment.columns]
+    tipos_corr = dict(df_corrections.dtypes)
+
+    def valor(c):
+        # Como pd.notna: un NaN tampoco cuenta como correccion
+        if tipos_corr[c] in ('double', 'float'):
+            return F.when(~F.isnan(F.col(c)), F.col(c))
+        return F.col(c)
+
+    por_fecha = (Window.partitionBy('date').orderBy('_orden')
+                 .rowsBetween(Window.unboundedPreceding, Window.unboundedFollowing))
+    corrections = (df_corrections
+                   .withColumn('date', F.to_timestamp(F.col('date')))
+                   .withColumn('_orden', F.monotonically_increasing_id())
+                   .select(F.col('date'), *[F.last(valor(c), ignorenulls=True).over(por_fecha).alias(f'_corr_{c}')
+                                            for c in cols])
+                   .dropDuplicates(['date']))
+
+    # Las correcciones son pocas filas: broadcast join en vez de un shuffle
+    tipos = dict(df_equipment.dtypes)
+    joined = df_equipment.join(F.broadcast(corrections), on='date', how='left')
+    return joined.select([
+        F.coalesce(F.col(f'_corr_{c}'), F.col(c)).cast(tipos[c]).alias(c) if c in cols else F.col(c)
+        for c in df_equipment.columns
+    ])
+
+
+def _agregar(df, columna, unidad):
+    inicio = F.date_trunc(unidad, F.col('date')).alias(columna)
+    sumas = [F.sum(F.col(c)).alias(c) for c in _columnas_numericas(df)]
+    return df.groupBy(inicio).agg(*sumas).orderBy(columna)
+
+
+def generar_metricas_agregadas(df_equipment, df_personnel):
+    """Genera métricas agregadas para el dashboard (Spark).
+
+    Las claves 'month' y 'week' son el inicio del periodo (las semanas empiezan
+    en lunes, como los periodos 'W' de pandas).
+    """
+    print("Generando metricas agregadas (Spark)...")
+
+    metricas = {}
+    if 'date' in df_equipment.columns:
+        metricas['monthly_equipment'] = _agregar(df_equipment, 'month', 'month')
+        metricas['weekly_equipment'] = _agregar(df_equipment, 'week', 'week')
+    if 'date' in df_personnel.columns:
+        metricas['monthly_personnel'] = _agregar(df_personnel, 'month', 'month')
+        metricas['weekly_personnel'] = _agregar(df_personnel, 'week', 'week')
+    return metricas
+
+
+def _comparar(nombre, esperado, obtenido):
+    try:
+        pd.testing.assert_frame_equal(esperado, obtenido, check_dtype=False, check_exact=False)
+        print(f"  {nombre}: OK")
+        return True
+    except AssertionError as e:
+        print(f"  {nombre}: DIFERENCIAS\n{e}")
+        return False
+
+
+def validar_contra_pandas(equipment_pd, personnel_pd, metricas_pd, equipment_sp, personnel_sp, metricas_sp):
+    """Compara las salidas de Spark con las de pandas. Devuelve True si coinciden"""
+    print("\nValidando backend Spark contra pandas...")
+
+    def a_pandas(df_spark, orden):
+        return df_spark.toPandas().sort_values(orden).reset_index(drop=True)
+
+    ok = _comparar('equipamiento', equipment_pd.sort_values('date').reset_index(drop=True),
+                   a_pandas(equipment_sp, 'date'))
+    ok &= _comparar('personal', personnel_pd.sort_values('date').reset_index(drop=True),
+                    a_pandas(personnel_sp, 'date'))
+
+    for clave, esperado in metricas_pd.items():
+        columna = esperado.index.name
+        esperado = esperado.copy()
+        esperado.index = esperado.index.start_time
+        esperado = esperado.reset_index()
+        ok &= _comparar(clave, esperado, a_pandas(metricas_sp[clave], columna)[esperado.columns])
+
+    return ok
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Puntos maximos por serie al graficar (aprox. ancho en pixeles del grafico)
+PUNTOS_OBJETIVO = 1000
+
+# A partir de cuantos puntos por figura se usan trazas WebGL (Scattergl)
+UMBRAL_WEBGL = 5000
+
+# Cache de series reducidas: (clave_serie, huella_datos, rango, n_puntos, metodo) -> (x, y)
+# Se descartan las entradas menos usadas al superar MAX_CACHE (cada zoom crea una)
+MAX_CACHE = 256
+_cache_reducidas = OrderedDict()
+
+
+def _a_numerico(x):
+    """Convierte el eje x (fechas o numeros) a float64 para los calculos"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if np.issubdtype(x.dtype, np.number):
+        return x.astype(np.float64)
+    # Ejes categoricos o de texto (por ejemplo semanas como '2022-W09'): usar la posicion
+    return np.arange(len(x), dtype=np.float64)
+
+
+def _huella(x, y):
+    """Huella de los datos de la serie: si se recargan, la clave de cache cambia"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) == 0:
+        return (0,)
+    return (len(x), x[0].item() if hasattr(x[0], 'item') else x[0],
+            x[-1].item() if hasattr(x[-1], 'item') else x[-1],
+            int(pd.util.hash_pandas_object(pd.Series(y), index=False).sum()))
+
+
+def indices_lttb(x, y, n_puntos):
+    """Indices de la serie reducida con Largest-Triangle-Three-Buckets.
+
+    Los NaN de y se ignoran: un bucket solo devuelve un NaN (su primer punto)
+    si todos sus valores son NaN, y asi el hueco se sigue viendo en el grafico.
+    """
+    n = len(y)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+
+    x = _a_numerico(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Limites de los buckets interiores (el primero y ultimo punto se conservan)
+    limites = np.linspace(1, n - 1, n_puntos - 1).astype(np.int64)
+    indices = np.empty(n_puntos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Promedios de cada bucket (sin NaN), usados como tercer vertice del triangulo
+    validos = ~np.isnan(y)
+    interior = slice(1, n - 1)
+    cuentas = np.add.reduceat(validos[interior].astype(np.int64), limites[:-1] - 1)
+    sumas_x = np.add.reduceat(np.where(validos, x, 0.0)[interior], limites[:-1] - 1)
+    sumas_y = np.add.reduceat(np.where(validos, y, 0.0)[interior], limites[:-1] - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        medias_x = np.append(sumas_x / cuentas, x[-1])
+        medias_y = np.append(sumas_y / cuentas, y[-1])
+
+    # Vertice anterior: el ultimo punto elegido que no es NaN
+    if not validos.any():
+        return np.linspace(0, n - 1, n_puntos).astype(np.int64)
+    primero = int(np.argmax(validos))
+    ax, ay = x[primero], y[primero]
+    for i in range(n_puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        if not validos[inicio:fin].any():
+            indices[i + 1] = inicio
+            continue
+        cx, cy = medias_x[i + 1], medias_y[i + 1]
+        if np.isnan(cy):
+            # Bucket siguiente vacio: linea base horizontal desde el vertice anterior
+            cx, cy = x[min(fin, n - 1)], ay
+        # Area del triangulo (sin el factor 1/2) para todos los puntos del bucket
+        areas = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        elegido = inicio + int(np.nanargmax(areas))
+        indices[i + 1] = elegido
+        ax, ay = x[elegido], y[elegido]
+
+    return indices
+
+
+def indices_minmax(y, n_puntos):
+    """Indices con minimo y maximo por bucket (conserva picos y valles)"""
+    n = len(y)
+    if n_puntos >= n:
+        return np.arange(n)
+
+    n_buckets = max(n_puntos // 2, 1)
+    y = np.asarray(y, dtype=np.float64)
+    limites = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    indices = []
+    for inicio, fin in zip(limites[:-1], limites[1:]):
+        if fin <= inicio:
+            continue
+        bloque = y[inicio:fin]
+        if np.all(np.isnan(bloque)):
+            indices.extend([inicio, fin - 1])
+            continue
+        indices.append(inicio + int(np.nanargmin(bloque)))
+        indices.append(inicio + int(np.nanargmax(bloque)))
+    return np.unique(np.array(indices, dtype=np.int64))
+
+
+def reducir_serie(x, y, n_puntos=PUNTOS_OBJETIVO, metodo='lttb', rango=None, clave=None):
+    """Reduce una serie (x, y) a n_puntos conservando su forma.
+
+    Si se pasa un rango (x_min, x_max) solo se reduce el tramo visible, lo que
+    permite recalcular al hacer zoom. Con una clave el resultado se guarda en cache
+    por (clave, huella de los datos, rango, n_puntos, metodo), asi que al recargar
+    los datos con la misma clave se vuelve a reducir.
+    """
+    cache_key = None
+    if clave is not None:
+        cache_key = (clave, _huella(x, y), rango, n_puntos, metodo)
+        if cache_key in _cache_reducidas:
+            _cache_reducidas.move_to_end(cache_key)
+            return _cache_reducidas[cache_key]
+
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    if rango is not None:
+        mascara = (x >= rango[0]) & (x <= rango[1])
+        x, y = x[mascara], y[mascara]
+
+    # LTTB supone x ordenado
+    if len(x) > 1 and np.any(np.diff(_a_numerico(x)) < 0):
+        orden = np.argsort(x, kind='stable')
+        x, y = x[orden], y[orden]
+
+    if metodo == 'minmax':
+        indices = indices_minmax(y, n_puntos)
+    else:
+        indices = indices_lttb(x, y, n_puntos)
+
+    resultado = (x[indices], y[indices])
+    if cache_key is not None:
+        _cache_reducidas[cache_key] = resultado
+        while len(_cache_reducidas) > MAX_CACHE:
+            _cache_reducidas.popitem(last=False)
+    return resultado
+
+
+def reducir_dataframe(df, x, columnas, n_puntos=PUNTOS_OBJETIVO, metodo='lttb', rango=None, clave=None):
+    """Reduce varias columnas de un DataFrame y devuelve un DataFrame largo (x, variable, valor)"""
+    partes = []
+    for col in columnas:
+        clave_col = (clave, col) if clave is not None else None
+        xs, ys = reducir_serie(df[x].values, df[col].values, n_puntos=n_puntos,
+                               metodo=metodo, rango=rango, clave=clave_col)
+        partes.append(pd.DataFrame({x: xs, 'variable': col, 'value': ys}))
+    return pd.concat(partes, ignore_index=True)
+
+
+def limpiar_cache():
+    """Vacia el cache de series reducidas (por ejemplo al recargar datos)"""
+    _cache_reducidas.clear()
+
+
+def figura_lineas(df, x, y, title=None, n_puntos=PUNTOS_OBJETIVO, umbral_webgl=UMBRAL_WEBGL,
+                  metodo='lttb', clave=None):
+    """Crea una figura de lineas de Plotly con series reducidas.
+
+    Equivalente a px.line(df, x=x, y=y, title=title). Cuando el total de puntos
+    que se dibujan (ya reducidos) supera umbral_webgl se usan trazas Scattergl.
+    """
+    import plotly.graph_objects as go
+
+    columnas = [y] if isinstance(y, str) else list(y)
+    series = []
+    for col in columnas:
+        clave_col = (clave, col) if clave is not None else None
+        series.append((col, *reducir_serie(df[x].values, df[col].values, n_puntos=n_puntos,
+                                           metodo=metodo, clave=clave_col)))
+
+    usar_webgl = sum(len(xs) for _, xs, _ in series) > umbral_webgl
+    Traza = go.Scattergl if usar_webgl else go.Scatter
+
+    fig = go.Figure()
+    for col, xs, ys in series:
+        fig.add_trace(Traza(x=xs, y=ys, mode='lines', name=col))
+
+    fig.update_layout(title=title, xaxis_title=x,
+                      yaxis_title=columnas[0] if len(columnas) == 1 else 'value',
+                      legend_title_text='variable')
+    return fig